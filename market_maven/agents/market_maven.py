@@ -2,6 +2,9 @@
 Stock Market Agent using Google Generative AI.
 """
 
+import asyncio
+import concurrent.futures
+import threading
 import google.generativeai as genai
 from typing import Dict, Any, List, Optional
 import json
@@ -104,9 +107,11 @@ You are an AI-powered stock market agent. Your primary responsibilities include:
         try:
             logger.info(f"Analyzing stock {symbol}")
             
-            # Fetch real-time data
-            quote_data = await data_fetcher.fetch_stock_quote(symbol)
-            company_info = await data_fetcher.fetch_company_info(symbol)
+            # Fetch real-time data concurrently
+            quote_data, company_info = await asyncio.gather(
+                data_fetcher.fetch_stock_quote(symbol),
+                data_fetcher.fetch_company_info(symbol)
+            )
             
             # Check for errors
             if quote_data.get('error'):
@@ -270,7 +275,23 @@ Format your response as a structured analysis.
         return health_status
 
 
-import asyncio
+# Shared worker used to run coroutines when the caller is already inside an
+# event loop (e.g. FastAPI handlers); created lazily and reused for the life
+# of the process instead of spawning a new thread per call.
+_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Get the process-wide executor for running coroutines off-loop."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(
+                    thread_name_prefix="market-maven-sync"
+                )
+    return _executor
 
 
 class SyncStockMarketAgent:
@@ -284,11 +305,9 @@ class SyncStockMarketAgent:
         try:
             loop = asyncio.get_event_loop()
             if loop.is_running():
-                # If we're already in an async context, create a new task
-                import concurrent.futures
-                with concurrent.futures.ThreadPoolExecutor() as executor:
-                    future = executor.submit(asyncio.run, coro)
-                    return future.result()
+                # If we're already in an async context, run on the shared worker
+                future = _get_executor().submit(asyncio.run, coro)
+                return future.result()
             else:
                 # If no loop is running, use asyncio.run
                 return asyncio.run(coro)
@@ -28,6 +28,10 @@ class APISettings(BaseSettings):
     alpha_vantage_requests_per_minute: int = 5
     alpha_vantage_requests_per_day: int = 500
     
+    # Request timeouts (seconds)
+    alpha_vantage_connect_timeout: float = 3.05
+    alpha_vantage_read_timeout: float = 10.0
+    
     model_config = ConfigDict(extra="allow")
 
 
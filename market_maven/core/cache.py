@@ -2,50 +2,84 @@
 In-memory caching implementation.
 """
 
+import asyncio
+import concurrent.futures
+import threading
 import time
-from typing import Any, Dict, Optional
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, Dict, Optional
 from contextlib import asynccontextmanager
 
 from market_maven.core.logging import get_logger
 
 logger = get_logger(__name__)
 
+# Handed to get_or_set waiters when the producer was cancelled.
+_PRODUCER_ABORTED = object()
+
 
 class CacheKeyBuilder:
-    """Build standardized cache keys."""
+    """Build standardized cache keys.
+    
+    Keys are memoized: the same handful of symbols is looked up repeatedly,
+    so steady-state key construction is a dict lookup.
+    """
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def stock_quote(symbol: str) -> str:
         """Build cache key for stock quote."""
         return f"quote:{symbol.upper()}"
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def stock_analysis(symbol: str, period: str = "daily") -> str:
         """Build cache key for stock analysis."""
         return f"analysis:{symbol.upper()}:{period}"
     
     @staticmethod
+    @lru_cache(maxsize=4096)
     def market_data(symbol: str) -> str:
         """Build cache key for market data."""
         return f"market_data:{symbol.upper()}"
+    
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def company_info(symbol: str) -> str:
+        """Build cache key for company information."""
+        return f"company_info:{symbol.upper()}"
 
 
 class InMemoryCache:
-    """In-memory cache implementation."""
+    """In-memory LRU cache with per-entry TTL."""
     
-    def __init__(self, default_ttl: int = 300):  # 5 minutes default
-        self.cache: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, default_ttl: int = 300, max_size: int = 10_000):  # 5 minutes default
+        # Entries are kept in least- to most-recently-used order so the
+        # oldest one can be evicted in O(1) once max_size is reached.
+        self.cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self.default_ttl = default_ttl
+        self.max_size = max_size
+        # Producers currently running for get_or_set, keyed by cache key.
+        # concurrent.futures (not asyncio) futures so callers on other
+        # threads' event loops can wait on them too.
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._inflight_lock = threading.Lock()
         
     async def get(self, key: str, default: Any = None) -> Any:
         """Get value from cache."""
+        return self._lookup(key, default)
+    
+    def _lookup(self, key: str, default: Any = None) -> Any:
+        """Return a live entry's value, dropping it if it has expired."""
         if key in self.cache:
             data = self.cache[key]['data']
             timestamp = self.cache[key]['timestamp']
             ttl = self.cache[key].get('ttl', self.default_ttl)
             
-            if time.time() - timestamp < ttl:
+            if time.monotonic() - timestamp < ttl:
                 # Cache hit
+                self.cache.move_to_end(key)
                 logger.debug(f"Cache hit for key: {key}")
                 return data
             else:
@@ -60,12 +94,80 @@ class InMemoryCache:
         """Set value in cache."""
         self.cache[key] = {
             'data': value,
-            'timestamp': time.time(),
+            'timestamp': time.monotonic(),
             'ttl': ttl or self.default_ttl
         }
+        self.cache.move_to_end(key)
+        if len(self.cache) > self.max_size:
+            evicted_key, _ = self.cache.popitem(last=False)
+            logger.debug(f"Cache evicted key: {evicted_key}")
         logger.debug(f"Cache set for key: {key}, ttl: {ttl or self.default_ttl}s")
         return True
     
+    async def get_or_set(
+        self,
+        key: str,
+        producer: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Get value from cache, producing and storing it on a miss.
+        
+        Concurrent misses on the same key share a single producer call. If
+        the producer raises, nothing is cached and every waiter gets the
+        exception. If it is cancelled, waiters retry instead.
+        
+        Args:
+            key: Cache key
+            producer: Coroutine function computing the value
+            ttl: Time to live in seconds (defaults to default_ttl)
+            
+        Returns:
+            Cached or freshly produced value
+        """
+        while True:
+            with self._inflight_lock:
+                # Checked under the lock so a caller arriving just after a
+                # producer finished reads its value instead of refetching.
+                value = self._lookup(key)
+                if value is not None:
+                    return value
+                
+                future = self._inflight.get(key)
+                is_producer = future is None
+                if is_producer:
+                    future = concurrent.futures.Future()
+                    # A running future can no longer be cancelled, so one
+                    # waiter giving up cannot cancel it for everyone else.
+                    future.set_running_or_notify_cancel()
+                    self._inflight[key] = future
+            
+            if is_producer:
+                break
+            
+            logger.debug(f"Cache waiting on in-flight producer for key: {key}")
+            value = await asyncio.shield(asyncio.wrap_future(future))
+            if value is not _PRODUCER_ABORTED:
+                return value
+            # The producer was cancelled; retry, possibly as the new producer.
+        
+        try:
+            value = await producer()
+            await self.set(key, value, ttl)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        except BaseException:
+            # Cancellation belongs to the producer's caller only; waiters
+            # are released to retry rather than being cancelled too.
+            future.set_result(_PRODUCER_ABORTED)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+    
     async def delete(self, key: str) -> bool:
         """Delete value from cache."""
         if key in self.cache:
@@ -84,12 +186,24 @@ class InMemoryCache:
         if key in self.cache:
             timestamp = self.cache[key]['timestamp']
             ttl = self.cache[key].get('ttl', self.default_ttl)
-            if time.time() - timestamp < ttl:
+            if time.monotonic() - timestamp < ttl:
                 return True
             else:
                 del self.cache[key]
         return False
     
+    async def purge_expired(self) -> int:
+        """Remove all expired entries in a single pass."""
+        now = time.monotonic()
+        # Scan a snapshot: other threads may get/set/delete entries meanwhile.
+        expired_keys = [
+            key for key, entry in list(self.cache.items())
+            if now - entry['timestamp'] >= entry.get('ttl', self.default_ttl)
+        ]
+        for key in expired_keys:
+            self.cache.pop(key, None)
+        return len(expired_keys)
+    
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics."""
         total_keys = len(self.cache)
@@ -123,18 +237,7 @@ class CacheManager:
     
     async def clear_expired(self) -> int:
         """Clear expired entries."""
-        expired_count = 0
-        keys_to_delete = []
-        
-        for key, data in list(self.cache.cache.items()):
-            timestamp = data['timestamp']
-            ttl = data.get('ttl', self.cache.default_ttl)
-            if time.time() - timestamp >= ttl:
-                keys_to_delete.append(key)
-        
-        for key in keys_to_delete:
-            await self.cache.delete(key)
-            expired_count += 1
+        expired_count = await self.cache.purge_expired()
         
         if expired_count > 0:
             logger.info(f"Cleared {expired_count} expired cache entries")
@@ -2,17 +2,26 @@
 Data fetcher for Alpha Vantage API.
 """
 
+import asyncio
+import threading
 import requests
-from typing import Dict, Any, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from collections import deque
+from typing import Deque, Dict, Any, Optional
 from datetime import datetime
 import time
 
 from market_maven.config.settings import settings
 from market_maven.core.logging import get_logger
 from market_maven.core.cache import cache_manager, CacheKeyBuilder
+from market_maven.core.exceptions import DataFetchError
 
 logger = get_logger(__name__)
 
+# Alpha Vantage limits are per minute; request times are monotonic_ns stamps
+RATE_LIMIT_WINDOW_NS = 60 * 1_000_000_000
+
 
 class DataFetcher:
     """Data fetcher for stock market data using Alpha Vantage."""
@@ -20,96 +29,72 @@ class DataFetcher:
     def __init__(self):
         self.api_key = settings.api.alpha_vantage_api_key
         self.base_url = settings.api.alpha_vantage_base_url
-        self.last_request_time = 0
-        self.min_request_interval = 12  # 5 requests per minute = 12 seconds between requests
+        
+        # Reuse pooled keep-alive connections across requests instead of a
+        # fresh TCP/TLS handshake per call; retry transient upstream errors.
+        # Retries bypass _rate_limit, so 429 is not retried here: hammering
+        # a rate-limited API on a short backoff only burns more quota.
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.2,
+                status_forcelist=[500, 502, 503, 504],
+                respect_retry_after_header=True
+            )
+        ))
+        
+        # Every concurrent caller for a symbol waits on one request, and a
+        # to_thread worker can't be cancelled, so never block indefinitely.
+        self.timeout = (
+            settings.api.alpha_vantage_connect_timeout,
+            settings.api.alpha_vantage_read_timeout
+        )
+        
+        self.requests_per_minute = settings.api.alpha_vantage_requests_per_minute
+        # Timestamps of the most recent requests; the oldest one falls out
+        # automatically once the window holds requests_per_minute entries.
+        self.request_times: Deque[int] = deque(maxlen=self.requests_per_minute)
+        self._rate_limit_lock = threading.Lock()
     
-    def _rate_limit(self):
+    async def _rate_limit(self):
         """Enforce rate limiting for Alpha Vantage API."""
-        current_time = time.time()
-        time_since_last_request = current_time - self.last_request_time
+        with self._rate_limit_lock:
+            current_time = time.monotonic_ns()
+            request_time = current_time
+            if len(self.request_times) == self.requests_per_minute:
+                request_time = max(current_time, self.request_times[0] + RATE_LIMIT_WINDOW_NS)
+            # Reserve the slot before sleeping so concurrent callers queue
+            # behind it instead of all waking up on the same slot.
+            self.request_times.append(request_time)
         
-        if time_since_last_request < self.min_request_interval:
-            sleep_time = self.min_request_interval - time_since_last_request
+        sleep_time = (request_time - current_time) / 1_000_000_000
+        if sleep_time > 0:
             logger.info(f"Rate limiting: sleeping for {sleep_time:.2f} seconds")
-            time.sleep(sleep_time)
-        
-        self.last_request_time = time.time()
+            await asyncio.sleep(sleep_time)
     
     async def fetch_stock_quote(self, symbol: str) -> Dict[str, Any]:
         """Fetch current stock quote data."""
         cache_key = CacheKeyBuilder.stock_quote(symbol)
         
-        # Check cache first
-        async with cache_manager.get_cache() as cache:
-            cached_data = await cache.get(cache_key)
-            if cached_data:
-                logger.info(f"Retrieved quote for {symbol} from cache")
-                return cached_data
-        
-        # Rate limit before making request
-        self._rate_limit()
-        
         try:
-            # Make API request
-            params = {
-                'function': 'GLOBAL_QUOTE',
-                'symbol': symbol,
-                'apikey': self.api_key
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for API errors
-            if 'Error Message' in data:
-                logger.error(f"API error for {symbol}: {data['Error Message']}")
-                return {
-                    'error': True,
-                    'message': data['Error Message'],
-                    'symbol': symbol
-                }
-            
-            if 'Note' in data:  # Rate limit message
-                logger.warning(f"API rate limit reached: {data['Note']}")
-                return {
-                    'error': True,
-                    'message': 'Rate limit reached. Please try again later.',
-                    'symbol': symbol
-                }
-            
-            if 'Global Quote' not in data or not data['Global Quote']:
-                logger.warning(f"No data returned for {symbol}")
-                return {
-                    'error': True,
-                    'message': f'No data available for symbol {symbol}',
-                    'symbol': symbol
-                }
-            
-            # Parse the response
-            quote_data = data['Global Quote']
-            parsed_data = {
-                'symbol': quote_data.get('01. symbol', symbol),
-                'price': float(quote_data.get('05. price', 0)),
-                'open': float(quote_data.get('02. open', 0)),
-                'high': float(quote_data.get('03. high', 0)),
-                'low': float(quote_data.get('04. low', 0)),
-                'volume': int(quote_data.get('06. volume', 0)),
-                'change': float(quote_data.get('09. change', 0)),
-                'change_percent': quote_data.get('10. change percent', '0%').rstrip('%'),
-                'previous_close': float(quote_data.get('08. previous close', 0)),
-                'timestamp': quote_data.get('07. latest trading day', datetime.now().isoformat()),
-                'fetched_at': datetime.now().isoformat()
-            }
-            
-            # Cache the data
             async with cache_manager.get_cache() as cache:
-                await cache.set(cache_key, parsed_data, ttl=300)  # 5 minutes cache
-            
-            logger.info(f"Successfully fetched quote for {symbol}")
-            return parsed_data
-            
+                # Served from cache when fresh; concurrent misses for the
+                # same symbol share one request
+                return await cache.get_or_set(
+                    cache_key,
+                    lambda: self._request_stock_quote(symbol),
+                    ttl=300  # 5 minutes cache
+                )
+            
+        except DataFetchError as e:
+            return {
+                'error': True,
+                'message': e.message,
+                'symbol': symbol
+            }
         except requests.exceptions.RequestException as e:
             logger.error(f"Error fetching quote for {symbol}: {e}")
             return {
@@ -125,69 +110,86 @@ class DataFetcher:
                 'symbol': symbol
             }
     
-    async def fetch_company_info(self, symbol: str) -> Dict[str, Any]:
-        """Fetch company overview information."""
-        cache_key = f"company_info:{symbol.upper()}"
+    async def _request_stock_quote(self, symbol: str) -> Dict[str, Any]:
+        """Request and parse a stock quote from Alpha Vantage."""
+        # Rate limit before making request
+        await self._rate_limit()
         
-        # Check cache first
-        async with cache_manager.get_cache() as cache:
-            cached_data = await cache.get(cache_key)
-            if cached_data:
-                logger.info(f"Retrieved company info for {symbol} from cache")
-                return cached_data
+        # Make API request
+        params = {
+            'function': 'GLOBAL_QUOTE',
+            'symbol': symbol,
+            'apikey': self.api_key
+        }
         
-        # Rate limit before making request
-        self._rate_limit()
+        response = await asyncio.to_thread(
+            self.session.get, self.base_url, params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # Check for API errors
+        if 'Error Message' in data:
+            logger.error(f"API error for {symbol}: {data['Error Message']}")
+            raise DataFetchError(data['Error Message'], symbol=symbol, source="alpha_vantage")
+        
+        if 'Note' in data:  # Rate limit message
+            logger.warning(f"API rate limit reached: {data['Note']}")
+            raise DataFetchError(
+                'Rate limit reached. Please try again later.',
+                symbol=symbol,
+                source="alpha_vantage"
+            )
+        
+        if 'Global Quote' not in data or not data['Global Quote']:
+            logger.warning(f"No data returned for {symbol}")
+            raise DataFetchError(
+                f'No data available for symbol {symbol}',
+                symbol=symbol,
+                source="alpha_vantage"
+            )
+        
+        # Parse the response
+        quote_data = data['Global Quote']
+        fetched_at = datetime.now().isoformat()
+        parsed_data = {
+            'symbol': quote_data.get('01. symbol', symbol),
+            'price': float(quote_data.get('05. price', 0)),
+            'open': float(quote_data.get('02. open', 0)),
+            'high': float(quote_data.get('03. high', 0)),
+            'low': float(quote_data.get('04. low', 0)),
+            'volume': int(quote_data.get('06. volume', 0)),
+            'change': float(quote_data.get('09. change', 0)),
+            'change_percent': quote_data.get('10. change percent', '0%').rstrip('%'),
+            'previous_close': float(quote_data.get('08. previous close', 0)),
+            'timestamp': quote_data.get('07. latest trading day', fetched_at),
+            'fetched_at': fetched_at
+        }
+        
+        logger.info(f"Successfully fetched quote for {symbol}")
+        return parsed_data
+    
+    async def fetch_company_info(self, symbol: str) -> Dict[str, Any]:
+        """Fetch company overview information."""
+        cache_key = CacheKeyBuilder.company_info(symbol)
         
         try:
-            # Make API request
-            params = {
-                'function': 'OVERVIEW',
-                'symbol': symbol,
-                'apikey': self.api_key
-            }
-            
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Check for errors
-            if not data or 'Symbol' not in data:
-                logger.warning(f"No company info returned for {symbol}")
-                return {
-                    'error': True,
-                    'message': f'No company information available for {symbol}',
-                    'symbol': symbol
-                }
-            
-            # Parse relevant fields
-            parsed_data = {
-                'symbol': data.get('Symbol', symbol),
-                'name': data.get('Name', 'Unknown'),
-                'description': data.get('Description', ''),
-                'exchange': data.get('Exchange', ''),
-                'currency': data.get('Currency', 'USD'),
-                'country': data.get('Country', ''),
-                'sector': data.get('Sector', ''),
-                'industry': data.get('Industry', ''),
-                'market_cap': int(data.get('MarketCapitalization', 0)),
-                'pe_ratio': float(data.get('PERatio', 0)) if data.get('PERatio') != 'None' else 0,
-                'dividend_yield': float(data.get('DividendYield', 0)) if data.get('DividendYield') != 'None' else 0,
-                '52_week_high': float(data.get('52WeekHigh', 0)),
-                '52_week_low': float(data.get('52WeekLow', 0)),
-                'eps': float(data.get('EPS', 0)) if data.get('EPS') != 'None' else 0,
-                'beta': float(data.get('Beta', 0)) if data.get('Beta') != 'None' else 0,
-                'fetched_at': datetime.now().isoformat()
-            }
-            
-            # Cache the data (longer TTL for company info)
             async with cache_manager.get_cache() as cache:
-                await cache.set(cache_key, parsed_data, ttl=3600)  # 1 hour cache
-            
-            logger.info(f"Successfully fetched company info for {symbol}")
-            return parsed_data
-            
+                # Served from cache when fresh; concurrent misses for the
+                # same symbol share one request
+                return await cache.get_or_set(
+                    cache_key,
+                    lambda: self._request_company_info(symbol),
+                    ttl=3600  # 1 hour cache (longer TTL for company info)
+                )
+            
+        except DataFetchError as e:
+            return {
+                'error': True,
+                'message': e.message,
+                'symbol': symbol
+            }
         except Exception as e:
             logger.error(f"Error fetching company info for {symbol}: {e}")
             return {
@@ -195,7 +197,57 @@ class DataFetcher:
                 'message': f'Error fetching company info: {str(e)}',
                 'symbol': symbol
             }
-
+    
+    async def _request_company_info(self, symbol: str) -> Dict[str, Any]:
+        """Request and parse a company overview from Alpha Vantage."""
+        # Rate limit before making request
+        await self._rate_limit()
+        
+        # Make API request
+        params = {
+            'function': 'OVERVIEW',
+            'symbol': symbol,
+            'apikey': self.api_key
+        }
+        
+        response = await asyncio.to_thread(
+            self.session.get, self.base_url, params=params, timeout=self.timeout
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        
+        # Check for errors
+        if not data or 'Symbol' not in data:
+            logger.warning(f"No company info returned for {symbol}")
+            raise DataFetchError(
+                f'No company information available for {symbol}',
+                symbol=symbol,
+                source="alpha_vantage"
+            )
+        
+        # Parse relevant fields
+        parsed_data = {
+            'symbol': data.get('Symbol', symbol),
+            'name': data.get('Name', 'Unknown'),
+            'description': data.get('Description', ''),
+            'exchange': data.get('Exchange', ''),
+            'currency': data.get('Currency', 'USD'),
+            'country': data.get('Country', ''),
+            'sector': data.get('Sector', ''),
+            'industry': data.get('Industry', ''),
+            'market_cap': int(data.get('MarketCapitalization', 0)),
+            'pe_ratio': float(data.get('PERatio', 0)) if data.get('PERatio') != 'None' else 0,
+            'dividend_yield': float(data.get('DividendYield', 0)) if data.get('DividendYield') != 'None' else 0,
+            '52_week_high': float(data.get('52WeekHigh', 0)),
+            '52_week_low': float(data.get('52WeekLow', 0)),
+            'eps': float(data.get('EPS', 0)) if data.get('EPS') != 'None' else 0,
+            'beta': float(data.get('Beta', 0)) if data.get('Beta') != 'None' else 0,
+            'fetched_at': datetime.now().isoformat()
+        }
+        
+        logger.info(f"Successfully fetched company info for {symbol}")
+        return parsed_data
 
 # Global instance
 data_fetcher = DataFetcher()
\ No newline at end of file
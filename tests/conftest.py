@@ -3,7 +3,6 @@ Pytest configuration and shared fixtures for the stock agent tests.
 """
 
 import pytest
-import asyncio
 from unittest.mock import Mock, patch
 from typing import Dict, Any, Generator
 from datetime import datetime, timedelta
@@ -14,12 +13,18 @@ from market_maven.core.logging import setup_logging
 from market_maven.models.schemas import StockPrice, CompanyInfo
 
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Decimal values used by the sample model fixtures
+_OPEN_150 = Decimal("150.00")
+_HIGH_155 = Decimal("155.00")
+_LOW_148 = Decimal("148.00")
+_CLOSE_152_50 = Decimal("152.50")
+_MARKET_CAP = Decimal("3000000000000")
+_PE_RATIO = Decimal("25.5")
+_EPS = Decimal("6.00")
+_DIVIDEND_PER_SHARE = Decimal("0.96")
+_DIVIDEND_YIELD = Decimal("0.0063")
+_WEEK_52_HIGH = Decimal("200.00")
+_WEEK_52_LOW = Decimal("120.00")
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -106,12 +111,12 @@ def sample_stock_price() -> StockPrice:
     return StockPrice(
         symbol="AAPL",
         timestamp=datetime(2024, 1, 15),
-        open=Decimal("150.00"),
-        high=Decimal("155.00"),
-        low=Decimal("148.00"),
-        close=Decimal("152.50"),
+        open=_OPEN_150,
+        high=_HIGH_155,
+        low=_LOW_148,
+        close=_CLOSE_152_50,
         volume=1000000,
-        adjusted_close=Decimal("152.50")
+        adjusted_close=_CLOSE_152_50
     )
 
 
@@ -124,13 +129,13 @@ def sample_company_info() -> CompanyInfo:
         sector="Technology",
         industry="Consumer Electronics",
         country="USA",
-        market_cap=Decimal("3000000000000"),
-        pe_ratio=Decimal("25.5"),
-        eps=Decimal("6.00"),
-        dividend_per_share=Decimal("0.96"),
-        dividend_yield=Decimal("0.0063"),
-        week_52_high=Decimal("200.00"),
-        week_52_low=Decimal("120.00")
+        market_cap=_MARKET_CAP,
+        pe_ratio=_PE_RATIO,
+        eps=_EPS,
+        dividend_per_share=_DIVIDEND_PER_SHARE,
+        dividend_yield=_DIVIDEND_YIELD,
+        week_52_high=_WEEK_52_HIGH,
+        week_52_low=_WEEK_52_LOW
     )
 
 
@@ -0,0 +1,99 @@
+"""
+Shared fixtures for unit tests.
+"""
+
+import os
+import tempfile
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import sqlite
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from market_maven.core.database import Base
+from market_maven.models import db_models  # noqa: F401  (registers tables on Base)
+
+
+def _schema_script():
+    """Compile the CREATE TABLE/INDEX statements for every mapped table."""
+    dialect = sqlite.dialect()
+    statements = []
+    for table in Base.metadata.sorted_tables:
+        statements.append(CreateTable(table).compile(dialect=dialect))
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            statements.append(CreateIndex(index).compile(dialect=dialect))
+    return "".join(f"{str(statement).strip()};\n" for statement in statements)
+
+
+# The schema is fixed for a test run, so compile it once and replay it.
+_SCHEMA_DDL = _schema_script()
+
+
+def _scratch_dir():
+    """Prefer tmpfs for the test database when the platform has one."""
+    return "/dev/shm" if os.path.isdir("/dev/shm") else None
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """Create a scratch file-backed database engine with the schema built once."""
+    fd, path = tempfile.mkstemp(suffix=".sqlite", dir=_scratch_dir())
+    os.close(fd)
+    
+    engine = create_engine(
+        f"sqlite:///{path}",
+        poolclass=QueuePool,
+        pool_size=5,
+    )
+    
+    # pysqlite's implicit BEGIN handling breaks SAVEPOINT; let SQLAlchemy
+    # emit BEGIN itself so nested transactions roll back correctly.
+    @event.listens_for(engine, "connect")
+    def _configure_connection(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+        # Test data is throwaway, so skip durability work on every commit.
+        dbapi_connection.execute("PRAGMA journal_mode=MEMORY")
+        dbapi_connection.execute("PRAGMA synchronous=OFF")
+        dbapi_connection.execute("PRAGMA temp_store=MEMORY")
+    
+    @event.listens_for(engine, "begin")
+    def _emit_begin(connection):
+        connection.exec_driver_sql("BEGIN")
+    
+    raw_connection = engine.raw_connection()
+    try:
+        raw_connection.executescript(_SCHEMA_DDL)
+    finally:
+        raw_connection.close()
+    
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        os.unlink(path)
+
+
+@pytest.fixture
+def db_session(engine):
+    """Create a database session whose changes are rolled back after each test."""
+    connection = engine.connect()
+    transaction = connection.begin()
+    # Session commits release a SAVEPOINT inside the outer transaction, so
+    # tests can commit freely and still leave the schema empty for the next.
+    SessionLocal = sessionmaker(
+        autocommit=False,
+        autoflush=False,
+        expire_on_commit=False,
+        bind=connection,
+        join_transaction_mode="create_savepoint",
+    )
+    session = SessionLocal()
+    
+    try:
+        yield session
+    finally:
+        session.close()
+        transaction.rollback()
+        connection.close()
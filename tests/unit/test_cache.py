@@ -0,0 +1,174 @@
+"""
+Unit tests for the in-memory cache.
+"""
+
+import asyncio
+
+import pytest
+
+from market_maven.core import cache as cache_module
+from market_maven.core.cache import InMemoryCache
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when told to."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the cache's monotonic clock."""
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, "monotonic", clock)
+    return clock
+
+
+class TestGetOrSet:
+    """Test single-flight get_or_set."""
+
+    async def test_concurrent_misses_run_producer_once(self):
+        """Test that concurrent misses on one key share a producer call."""
+        cache = InMemoryCache()
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"price": 150.0}
+
+        results = await asyncio.gather(
+            *(cache.get_or_set("quote:AAPL", producer) for _ in range(5))
+        )
+
+        assert calls == 1
+        assert results == [{"price": 150.0}] * 5
+        assert await cache.get("quote:AAPL") == {"price": 150.0}
+        assert cache._inflight == {}
+
+    async def test_hit_skips_producer(self):
+        """Test that a fresh entry is returned without calling the producer."""
+        cache = InMemoryCache()
+        await cache.set("quote:AAPL", {"price": 150.0})
+
+        async def producer():
+            raise AssertionError("producer should not run on a hit")
+
+        assert await cache.get_or_set("quote:AAPL", producer) == {"price": 150.0}
+
+    async def test_producer_exception_reaches_every_waiter(self):
+        """Test that a failing producer is not cached and fails all waiters."""
+        cache = InMemoryCache()
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream down")
+
+        results = await asyncio.gather(
+            *(cache.get_or_set("quote:AAPL", producer) for _ in range(3)),
+            return_exceptions=True
+        )
+
+        assert calls == 1
+        assert all(isinstance(result, ValueError) for result in results)
+        assert await cache.exists("quote:AAPL") is False
+        assert cache._inflight == {}
+
+    async def test_waiter_cancellation_does_not_affect_producer(self):
+        """Test that cancelling a waiter leaves the shared fetch running."""
+        cache = InMemoryCache()
+        release = asyncio.Event()
+
+        async def producer():
+            await release.wait()
+            return {"price": 150.0}
+
+        producer_task = asyncio.create_task(cache.get_or_set("quote:AAPL", producer))
+        await asyncio.sleep(0)
+        waiter_task = asyncio.create_task(cache.get_or_set("quote:AAPL", producer))
+        other_waiter_task = asyncio.create_task(cache.get_or_set("quote:AAPL", producer))
+        await asyncio.sleep(0)
+
+        waiter_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter_task
+
+        release.set()
+
+        assert await producer_task == {"price": 150.0}
+        assert await other_waiter_task == {"price": 150.0}
+        assert await cache.get("quote:AAPL") == {"price": 150.0}
+
+    async def test_producer_cancellation_lets_waiter_take_over(self):
+        """Test that a cancelled producer does not cancel its waiters."""
+        cache = InMemoryCache()
+        calls = 0
+
+        async def producer():
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.Event().wait()
+            return {"price": 150.0}
+
+        producer_task = asyncio.create_task(cache.get_or_set("quote:AAPL", producer))
+        await asyncio.sleep(0)
+        waiter_task = asyncio.create_task(cache.get_or_set("quote:AAPL", producer))
+        await asyncio.sleep(0)
+
+        producer_task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await producer_task
+
+        assert await waiter_task == {"price": 150.0}
+        assert calls == 2
+        assert cache._inflight == {}
+
+
+class TestEviction:
+    """Test LRU bounds and expiry."""
+
+    async def test_evicts_least_recently_used_at_max_size(self):
+        """Test that the least recently used entry goes once max_size is hit."""
+        cache = InMemoryCache(max_size=2)
+        await cache.set("a", 1)
+        await cache.set("b", 2)
+        await cache.get("a")  # "b" is now least recently used
+
+        await cache.set("c", 3)
+
+        assert len(cache.cache) == 2
+        assert await cache.get("b") is None
+        assert await cache.get("a") == 1
+        assert await cache.get("c") == 3
+
+    async def test_get_drops_expired_entry(self, clock):
+        """Test that an expired entry is removed on read."""
+        cache = InMemoryCache(default_ttl=60)
+        await cache.set("a", 1)
+
+        clock.now += 60
+
+        assert await cache.get("a") is None
+        assert "a" not in cache.cache
+
+    async def test_purge_expired_counts_removed_entries(self, clock):
+        """Test that purge_expired removes only expired entries."""
+        cache = InMemoryCache(default_ttl=60)
+        await cache.set("short", 1, ttl=10)
+        await cache.set("medium", 2, ttl=30)
+        await cache.set("long", 3, ttl=120)
+
+        clock.now += 30
+
+        assert await cache.purge_expired() == 2
+        assert list(cache.cache) == ["long"]
+        assert await cache.purge_expired() == 0
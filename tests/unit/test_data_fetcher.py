@@ -0,0 +1,113 @@
+"""
+Unit tests for the Alpha Vantage data fetcher.
+"""
+
+import asyncio
+import importlib
+import time
+from collections import deque
+
+import pytest
+
+from market_maven.core.cache import cache_manager, CacheKeyBuilder
+from market_maven.tools.data_fetcher import DataFetcher
+
+# market_maven.tools re-exports the data_fetcher instance under the module's name.
+data_fetcher_module = importlib.import_module("market_maven.tools.data_fetcher")
+
+
+# 50 ms stands in for the one-minute Alpha Vantage window.
+_WINDOW_NS = 50_000_000
+
+
+@pytest.fixture
+def fetcher(monkeypatch):
+    """DataFetcher allowing two requests per shortened window."""
+    monkeypatch.setattr(data_fetcher_module, "RATE_LIMIT_WINDOW_NS", _WINDOW_NS)
+    fetcher = DataFetcher()
+    fetcher.requests_per_minute = 2
+    fetcher.request_times = deque(maxlen=2)
+    yield fetcher
+    fetcher.session.close()
+
+
+class TestRateLimit:
+    """Test the sliding-window rate limiter."""
+
+    async def test_requests_within_limit_do_not_wait(self, fetcher):
+        """Test that requests under the limit go out immediately."""
+        start = time.monotonic_ns()
+        await fetcher._rate_limit()
+        await fetcher._rate_limit()
+
+        assert time.monotonic_ns() - start < _WINDOW_NS
+
+    async def test_full_window_queues_requests(self, fetcher):
+        """Test that requests past the limit wait for the window to slide."""
+        start = time.monotonic_ns()
+        await asyncio.gather(*(fetcher._rate_limit() for _ in range(4)))
+        elapsed = time.monotonic_ns() - start
+
+        # Requests 3 and 4 reuse the slots of 1 and 2, one window later.
+        assert elapsed >= _WINDOW_NS
+        assert elapsed < 2 * _WINDOW_NS
+        first, second = fetcher.request_times
+        assert first - start >= _WINDOW_NS
+        assert second - start >= _WINDOW_NS
+
+
+class TestFetchStockQuote:
+    """Test quote fetching through the shared cache."""
+
+    @pytest.fixture(autouse=True)
+    async def clear_cache(self):
+        """Start and finish each test with an empty global cache."""
+        await cache_manager.cache.clear()
+        yield
+        await cache_manager.cache.clear()
+
+    async def test_concurrent_fetches_share_one_request(self, fetcher, monkeypatch):
+        """Test that concurrent misses for a symbol hit the API once."""
+        calls = 0
+
+        async def request_stock_quote(symbol):
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return {"symbol": symbol, "price": 150.0}
+
+        monkeypatch.setattr(fetcher, "_request_stock_quote", request_stock_quote)
+
+        results = await asyncio.gather(
+            *(fetcher.fetch_stock_quote("AAPL") for _ in range(3))
+        )
+
+        assert calls == 1
+        assert results == [{"symbol": "AAPL", "price": 150.0}] * 3
+        assert await cache_manager.cache.get(CacheKeyBuilder.stock_quote("AAPL")) == {
+            "symbol": "AAPL", "price": 150.0
+        }
+
+    async def test_cancelled_fetch_does_not_abort_concurrent_fetch(self, fetcher, monkeypatch):
+        """Test that cancelling the caller that started a fetch spares the others."""
+        calls = 0
+
+        async def request_stock_quote(symbol):
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.Event().wait()
+            return {"symbol": symbol, "price": 150.0}
+
+        monkeypatch.setattr(fetcher, "_request_stock_quote", request_stock_quote)
+
+        first = asyncio.create_task(fetcher.fetch_stock_quote("AAPL"))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(fetcher.fetch_stock_quote("AAPL"))
+        await asyncio.sleep(0)
+
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        assert await second == {"symbol": "AAPL", "price": 150.0}
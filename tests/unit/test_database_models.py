@@ -4,38 +4,88 @@ Unit tests for database models.
 
 import pytest
 from datetime import datetime, timedelta
-from decimal import Decimal
-from uuid import uuid4
+from decimal import Decimal as D
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy import delete, event, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, raiseload, selectinload
 
-from market_maven.core.database import Base
 from market_maven.models.db_models import (
     StockSymbol, StockPriceHistory, CompanyInfoDB, AnalysisResultDB,
-    TradeOrderDB, TradeExecutionDB, PortfolioSnapshot, AlertConfiguration,
-    AuditLog, User, APIKey, OrderStatus, OrderType, OrderAction,
-    Recommendation, RiskLevel, AnalysisType
+    TradeOrderDB, TradeExecutionDB, AuditLog, User, APIKey, OrderStatus,
+    OrderType, OrderAction, Recommendation, RiskLevel, AnalysisType
 )
 
 
+_PRICE_145 = D("145.00")
+_PRICE_149 = D("149.00")
+_PRICE_150 = D("150.00")
+_PRICE_152 = D("152.00")
+_PRICE_152_50 = D("152.50")
+_PRICE_155 = D("155.00")
+_PRICE_160 = D("160.00")
+_PRICE_165 = D("165.00")
+_COMMISSION_1 = D("1.00")
+_MARKET_CAP = D("2500000000000")
+_PE_RATIO = D("25.5")
+_EPS = D("6.15")
+_DIVIDEND_YIELD = D("0.0045")
+
+
+@pytest.fixture(scope="module")
+def now():
+    """Timestamp shared by every test in this module."""
+    # is_expired compares against utcnow(), so this must stay close to the real clock.
+    return datetime.utcnow()
+
+
+def make_stock(session, **overrides):
+    """Insert a stock symbol with a single INSERT and return its id."""
+    values = {"symbol": "AAPL", "name": "Apple Inc.", **overrides}
+    return session.scalars(
+        insert(StockSymbol).returning(StockSymbol.id), [values]
+    ).one()
+
+
+@pytest.fixture(scope="module")
+def apple_id(engine):
+    """Id of an AAPL stock symbol that persists for the whole module."""
+    with Session(engine) as session:
+        stock_id = make_stock(session)
+        session.commit()
+    
+    yield stock_id
+    
+    with Session(engine) as session:
+        session.execute(delete(StockSymbol).where(StockSymbol.id == stock_id))
+        session.commit()
+
+
 @pytest.fixture
-def db_session():
-    """Create an in-memory database session for testing."""
-    engine = create_engine(
-        "sqlite:///:memory:",
-        connect_args={"check_same_thread": False},
-        poolclass=StaticPool,
+def test_user(db_session):
+    """Committed user account."""
+    user = User(
+        username="testuser",
+        email="test@example.com",
+        hashed_password="hashed_password"
     )
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-    session = SessionLocal()
+    db_session.add(user)
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def no_lazy_loads(db_session):
+    """Make lazy loads that would emit SQL raise for objects queried in the test."""
+    def _raiseload_all(orm_execute_state):
+        if orm_execute_state.is_select:
+            orm_execute_state.statement = orm_execute_state.statement.options(
+                raiseload("*", sql_only=True)
+            )
     
-    try:
-        yield session
-    finally:
-        session.close()
+    event.listen(db_session, "do_orm_execute", _raiseload_all)
+    yield
+    event.remove(db_session, "do_orm_execute", _raiseload_all)
 
 
 class TestStockSymbol:
@@ -44,10 +94,10 @@ class TestStockSymbol:
     def test_create_stock_symbol(self, db_session):
         """Test creating a stock symbol."""
         stock = StockSymbol(
-            symbol="AAPL",
-            name="Apple Inc.",
+            symbol="MSFT",
+            name="Microsoft Corporation",
             sector="Technology",
-            industry="Consumer Electronics",
+            industry="Software",
             country="US",
             currency="USD",
             exchange="NASDAQ"
@@ -55,45 +105,43 @@ class TestStockSymbol:
         
         db_session.add(stock)
         db_session.commit()
+        # Sessions don't expire on commit; reload to check the stored row.
+        db_session.refresh(stock)
         
         assert stock.id is not None
-        assert stock.symbol == "AAPL"
-        assert stock.name == "Apple Inc."
+        assert stock.symbol == "MSFT"
+        assert stock.name == "Microsoft Corporation"
         assert stock.sector == "Technology"
         assert stock.is_active is True
         assert stock.created_at is not None
     
     def test_unique_symbol_constraint(self, db_session):
         """Test that symbols must be unique."""
-        stock1 = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        stock2 = StockSymbol(symbol="AAPL", name="Apple Inc. Duplicate")
+        stock1 = StockSymbol(symbol="MSFT", name="Microsoft Corporation")
+        stock2 = StockSymbol(symbol="MSFT", name="Microsoft Corporation Duplicate")
         
         db_session.add(stock1)
         db_session.commit()
         
         db_session.add(stock2)
         
-        with pytest.raises(Exception):  # Should raise integrity error
+        with pytest.raises(IntegrityError):
             db_session.commit()
+        db_session.rollback()
 
 
 class TestStockPriceHistory:
     """Test StockPriceHistory model."""
     
-    def test_create_price_history(self, db_session):
+    def test_create_price_history(self, db_session, apple_id, now):
         """Test creating stock price history."""
-        # Create stock symbol first
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
         price_history = StockPriceHistory(
-            stock_id=stock.id,
-            timestamp=datetime.now(),
-            open=Decimal("150.00"),
-            high=Decimal("155.00"),
-            low=Decimal("149.00"),
-            close=Decimal("152.00"),
+            stock_id=apple_id,
+            timestamp=now,
+            open=_PRICE_150,
+            high=_PRICE_155,
+            low=_PRICE_149,
+            close=_PRICE_152,
             volume=1000000
         )
         
@@ -101,32 +149,37 @@ class TestStockPriceHistory:
         db_session.commit()
         
         assert price_history.id is not None
-        assert price_history.stock_id == stock.id
-        assert price_history.open == Decimal("150.00")
-        assert price_history.high == Decimal("155.00")
-        assert price_history.low == Decimal("149.00")
-        assert price_history.close == Decimal("152.00")
+        assert price_history.stock_id == apple_id
+        assert price_history.open == _PRICE_150
+        assert price_history.high == _PRICE_155
+        assert price_history.low == _PRICE_149
+        assert price_history.close == _PRICE_152
         assert price_history.volume == 1000000
     
-    def test_price_history_relationship(self, db_session):
+    def test_price_history_relationship(self, db_session, now, no_lazy_loads):
         """Test relationship between stock and price history."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
+        stock = StockSymbol(symbol="MSFT", name="Microsoft Corporation")
         price_history = StockPriceHistory(
-            stock_id=stock.id,
-            timestamp=datetime.now(),
-            open=Decimal("150.00"),
-            high=Decimal("155.00"),
-            low=Decimal("149.00"),
-            close=Decimal("152.00"),
+            stock=stock,
+            timestamp=now,
+            open=_PRICE_150,
+            high=_PRICE_155,
+            low=_PRICE_149,
+            close=_PRICE_152,
             volume=1000000
         )
         
-        db_session.add(price_history)
+        db_session.add_all([stock, price_history])
         db_session.commit()
         
+        stock = db_session.scalars(
+            select(StockSymbol)
+            .options(selectinload(StockSymbol.price_history))
+            .where(StockSymbol.id == price_history.stock_id)
+            # Sessions keep instances on commit; reload them from the stored rows.
+            .execution_options(populate_existing=True)
+        ).one()
+        
         # Test relationship
         assert price_history.stock == stock
         assert price_history in stock.price_history
@@ -135,18 +188,14 @@ class TestStockPriceHistory:
 class TestCompanyInfoDB:
     """Test CompanyInfoDB model."""
     
-    def test_create_company_info(self, db_session):
+    def test_create_company_info(self, db_session, apple_id):
         """Test creating company information."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
         company_info = CompanyInfoDB(
-            stock_id=stock.id,
-            market_cap=Decimal("2500000000000"),  # 2.5T
-            pe_ratio=Decimal("25.5"),
-            eps=Decimal("6.15"),
-            dividend_yield=Decimal("0.0045"),
+            stock_id=apple_id,
+            market_cap=_MARKET_CAP,  # 2.5T
+            pe_ratio=_PE_RATIO,
+            eps=_EPS,
+            dividend_yield=_DIVIDEND_YIELD,
             description="Apple Inc. designs, manufactures, and markets smartphones.",
             employees=150000
         )
@@ -155,11 +204,11 @@ class TestCompanyInfoDB:
         db_session.commit()
         
         assert company_info.id is not None
-        assert company_info.stock_id == stock.id
-        assert company_info.market_cap == Decimal("2500000000000")
-        assert company_info.pe_ratio == Decimal("25.5")
-        assert company_info.eps == Decimal("6.15")
-        assert company_info.dividend_yield == Decimal("0.0045")
+        assert company_info.stock_id == apple_id
+        assert company_info.market_cap == _MARKET_CAP
+        assert company_info.pe_ratio == _PE_RATIO
+        assert company_info.eps == _EPS
+        assert company_info.dividend_yield == _DIVIDEND_YIELD
         assert "Apple Inc." in company_info.description
         assert company_info.employees == 150000
 
@@ -167,14 +216,10 @@ class TestCompanyInfoDB:
 class TestAnalysisResultDB:
     """Test AnalysisResultDB model."""
     
-    def test_create_analysis_result(self, db_session):
+    def test_create_analysis_result(self, db_session, apple_id):
         """Test creating analysis result."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
         analysis = AnalysisResultDB(
-            stock_id=stock.id,
+            stock_id=apple_id,
             analysis_type=AnalysisType.COMPREHENSIVE,
             recommendation=Recommendation.BUY,
             confidence_score=0.85,
@@ -184,8 +229,8 @@ class TestAnalysisResultDB:
             overall_score=0.82,
             technical_score=0.78,
             fundamental_score=0.86,
-            current_price=Decimal("152.50"),
-            target_price=Decimal("165.00"),
+            current_price=_PRICE_152_50,
+            target_price=_PRICE_165,
             reasoning="Strong fundamentals with positive technical indicators."
         )
         
@@ -193,24 +238,20 @@ class TestAnalysisResultDB:
         db_session.commit()
         
         assert analysis.id is not None
-        assert analysis.stock_id == stock.id
+        assert analysis.stock_id == apple_id
         assert analysis.analysis_type == AnalysisType.COMPREHENSIVE
         assert analysis.recommendation == Recommendation.BUY
         assert analysis.confidence_score == 0.85
         assert analysis.risk_level == RiskLevel.MEDIUM
         assert analysis.overall_score == 0.82
-        assert analysis.current_price == Decimal("152.50")
+        assert analysis.current_price == _PRICE_152_50
         assert "Strong fundamentals" in analysis.reasoning
     
-    def test_analysis_expiration(self, db_session):
+    def test_analysis_expiration(self, db_session, apple_id, now):
         """Test analysis expiration property."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
         # Create expired analysis
         expired_analysis = AnalysisResultDB(
-            stock_id=stock.id,
+            stock_id=apple_id,
             analysis_type=AnalysisType.QUICK,
             recommendation=Recommendation.HOLD,
             confidence_score=0.6,
@@ -218,9 +259,9 @@ class TestAnalysisResultDB:
             risk_tolerance="conservative",
             investment_horizon="short_term",
             overall_score=0.6,
-            current_price=Decimal("150.00"),
+            current_price=_PRICE_150,
             reasoning="Neutral outlook.",
-            expires_at=datetime.now() - timedelta(hours=1)  # Expired 1 hour ago
+            expires_at=now - timedelta(hours=1)  # Expired 1 hour ago
         )
         
         db_session.add(expired_analysis)
@@ -230,7 +271,7 @@ class TestAnalysisResultDB:
         
         # Create non-expired analysis
         fresh_analysis = AnalysisResultDB(
-            stock_id=stock.id,
+            stock_id=apple_id,
             analysis_type=AnalysisType.QUICK,
             recommendation=Recommendation.HOLD,
             confidence_score=0.6,
@@ -238,9 +279,9 @@ class TestAnalysisResultDB:
             risk_tolerance="conservative",
             investment_horizon="short_term",
             overall_score=0.6,
-            current_price=Decimal("150.00"),
+            current_price=_PRICE_150,
             reasoning="Neutral outlook.",
-            expires_at=datetime.now() + timedelta(hours=1)  # Expires in 1 hour
+            expires_at=now + timedelta(hours=1)  # Expires in 1 hour
         )
         
         db_session.add(fresh_analysis)
@@ -252,20 +293,16 @@ class TestAnalysisResultDB:
 class TestTradeOrderDB:
     """Test TradeOrderDB model."""
     
-    def test_create_trade_order(self, db_session):
+    def test_create_trade_order(self, db_session, apple_id):
         """Test creating a trade order."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
         order = TradeOrderDB(
-            stock_id=stock.id,
+            stock_id=apple_id,
             action=OrderAction.BUY,
             quantity=100,
             order_type=OrderType.MARKET,
             status=OrderStatus.PENDING,
-            stop_loss=Decimal("145.00"),
-            take_profit=Decimal("160.00"),
+            stop_loss=_PRICE_145,
+            take_profit=_PRICE_160,
             broker_order_id="12345",
             strategy="momentum_breakout",
             dry_run=False
@@ -275,47 +312,41 @@ class TestTradeOrderDB:
         db_session.commit()
         
         assert order.id is not None
-        assert order.stock_id == stock.id
+        assert order.stock_id == apple_id
         assert order.action == OrderAction.BUY
         assert order.quantity == 100
         assert order.order_type == OrderType.MARKET
         assert order.status == OrderStatus.PENDING
-        assert order.stop_loss == Decimal("145.00")
-        assert order.take_profit == Decimal("160.00")
+        assert order.stop_loss == _PRICE_145
+        assert order.take_profit == _PRICE_160
         assert order.broker_order_id == "12345"
         assert order.strategy == "momentum_breakout"
         assert order.dry_run is False
     
-    def test_order_execution_relationship(self, db_session):
+    def test_order_execution_relationship(self, db_session, now):
         """Test relationship between orders and executions."""
-        stock = StockSymbol(symbol="AAPL", name="Apple Inc.")
-        db_session.add(stock)
-        db_session.commit()
-        
+        stock = StockSymbol(symbol="MSFT", name="Microsoft Corporation")
         order = TradeOrderDB(
-            stock_id=stock.id,
+            stock=stock,
             action=OrderAction.BUY,
             quantity=100,
             order_type=OrderType.MARKET,
             status=OrderStatus.FILLED
         )
-        
-        db_session.add(order)
-        db_session.commit()
-        
         execution = TradeExecutionDB(
-            order_id=order.id,
+            order=order,
             execution_id="EXEC123",
-            timestamp=datetime.now(),
-            price=Decimal("152.50"),
+            timestamp=now,
+            price=_PRICE_152_50,
             quantity=100,
-            commission=Decimal("1.00")
+            commission=_COMMISSION_1
         )
         
-        db_session.add(execution)
+        db_session.add_all([stock, order, execution])
         db_session.commit()
         
         # Test relationship
+        assert execution.order_id == order.id
         assert execution.order == order
         assert execution in order.executions
 
@@ -364,26 +395,18 @@ class TestUser:
         
         db_session.add(user2)
         
-        with pytest.raises(Exception):  # Should raise integrity error
+        with pytest.raises(IntegrityError):
             db_session.commit()
+        db_session.rollback()
 
 
 class TestAPIKey:
     """Test APIKey model."""
     
-    def test_create_api_key(self, db_session):
+    def test_create_api_key(self, db_session, test_user):
         """Test creating an API key."""
-        user = User(
-            username="testuser",
-            email="test@example.com",
-            hashed_password="hashed_password"
-        )
-        
-        db_session.add(user)
-        db_session.commit()
-        
         api_key = APIKey(
-            user_id=user.id,
+            user_id=test_user.id,
             key_hash="hashed_api_key",
             name="Test API Key",
             scopes=["read:analysis", "write:trades"],
@@ -395,33 +418,37 @@ class TestAPIKey:
         db_session.commit()
         
         assert api_key.id is not None
-        assert api_key.user_id == user.id
+        assert api_key.user_id == test_user.id
         assert api_key.key_hash == "hashed_api_key"
         assert api_key.name == "Test API Key"
         assert api_key.scopes == ["read:analysis", "write:trades"]
         assert api_key.rate_limit_per_hour == 100
         assert api_key.is_active is True
     
-    def test_api_key_user_relationship(self, db_session):
+    def test_api_key_user_relationship(self, db_session, no_lazy_loads):
         """Test relationship between API key and user."""
         user = User(
             username="testuser",
             email="test@example.com",
             hashed_password="hashed_password"
         )
-        
-        db_session.add(user)
-        db_session.commit()
-        
         api_key = APIKey(
-            user_id=user.id,
+            user=user,
             key_hash="hashed_api_key",
             name="Test API Key"
         )
         
-        db_session.add(api_key)
+        db_session.add_all([user, api_key])
         db_session.commit()
         
+        user = db_session.scalars(
+            select(User)
+            .options(selectinload(User.api_keys))
+            .where(User.id == api_key.user_id)
+            # Sessions keep instances on commit; reload them from the stored rows.
+            .execution_options(populate_existing=True)
+        ).one()
+        
         # Test relationship
         assert api_key.user == user
         assert api_key in user.api_keys